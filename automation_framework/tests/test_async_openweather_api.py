@@ -0,0 +1,144 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+from aiohttp import web
+from automation_framework.utilities.api_helpers import ApiHelper
+from automation_framework.utilities.archive_helpers import ArchiveHelper
+from automation_framework.utilities.async_api_helpers import AsyncApiHelper
+
+# City IDs with special behaviour of the stand-in server
+MISSING_DATA_CITY_ID = 1
+SLOW_CITY_ID = 2
+NOT_FOUND_CITY_ID = 3
+# City IDs from this one on are served slowly
+SLOW_CITY_IDS_START = 90000000
+
+# Requests handled by the stand-in server
+server_stats = {}
+
+async def weather_handler(request):
+    """Local stand-in for OpenWeather current weather endpoint"""
+    city_id = int(request.query['id'])
+    server_stats['in_flight'] += 1
+    server_stats['peak'] = max(server_stats['peak'], server_stats['in_flight'])
+    try:
+        if city_id == MISSING_DATA_CITY_ID:
+            return web.json_response({'cod': 200})
+        if city_id == SLOW_CITY_ID or city_id >= SLOW_CITY_IDS_START:
+            await asyncio.sleep(1)
+        if city_id == NOT_FOUND_CITY_ID:
+            return web.json_response({'cod': '404', 'message': 'city not found'}, status=404)
+        await asyncio.sleep(0.01)
+        return web.json_response({'id': city_id, 'dt': 1700000000, 'main': {'temp': city_id / 100, 'feels_like': 0.0}})
+    except asyncio.CancelledError:
+        server_stats['cancelled'] += 1
+        raise
+    finally:
+        server_stats['in_flight'] -= 1
+
+async def run_with_server(scenario):
+    server_stats.update(in_flight=0, peak=0, cancelled=0)
+    app = web.Application()
+    app.router.add_get('/data/2.5/weather', weather_handler)
+    # Cancel handlers when client disconnects, so cancelled requests are visible
+    runner = web.AppRunner(app, handler_cancellation=True)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await scenario(f'http://127.0.0.1:{port}/data/2.5/weather')
+    finally:
+        await runner.cleanup()
+
+def test_async_fan_out():
+    """
+    Test checks:
+    1. All cities are returned through the async iterator
+    2. Requests run concurrently within max_concurrency
+    """
+    city_ids = list(range(1000, 3000))
+    max_concurrency = 100
+
+    async def scenario(base_url):
+        async with AsyncApiHelper(base_url=base_url, max_concurrency=max_concurrency) as api:
+            start = time.perf_counter()
+            results = {city_id: data async for city_id, data in api.iter_current_weather(city_ids)}
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run_with_server(scenario))
+
+    assert set(results) == set(city_ids)
+    assert all(results[city_id]['main']['temp'] == city_id / 100 for city_id in city_ids)
+    assert 1 < server_stats['peak'] <= max_concurrency, \
+        f"Peak of {server_stats['peak']} requests in flight, expected at most {max_concurrency}"
+    print(f"\n{len(city_ids)} requests in {elapsed:.2f}s ({len(city_ids) / elapsed:.0f} req/s)")
+
+def test_async_validation_and_errors():
+    """
+    Test checks:
+    1. Response without weather data raises ValueError
+    2. HTTP errors and per-request timeouts are reported per city
+    """
+    async def scenario(base_url):
+        async with AsyncApiHelper(base_url=base_url) as api:
+            with pytest.raises(ValueError):
+                await api.get_current_weather(MISSING_DATA_CITY_ID)
+            return {
+                city_id: result async for city_id, result in api.iter_current_weather(
+                    [MISSING_DATA_CITY_ID, SLOW_CITY_ID, NOT_FOUND_CITY_ID, 2643743],
+                    timeout=0.2,
+                    return_exceptions=True
+                )
+            }
+
+    results = asyncio.run(run_with_server(scenario))
+
+    assert isinstance(results[MISSING_DATA_CITY_ID], ValueError)
+    assert isinstance(results[SLOW_CITY_ID], asyncio.TimeoutError)
+    assert isinstance(results[NOT_FOUND_CITY_ID], aiohttp.ClientResponseError)
+    assert results[2643743]['id'] == 2643743
+
+def test_async_iterator_close_cancels_requests():
+    """
+    Test checks:
+    1. Closing the iterator cancels requests still in flight
+    """
+    slow_city_ids = list(range(SLOW_CITY_IDS_START, SLOW_CITY_IDS_START + 10))
+
+    async def scenario(base_url):
+        async with AsyncApiHelper(base_url=base_url) as api:
+            results = api.iter_current_weather([2643743] + slow_city_ids)
+            city_id, _ = await results.__anext__()
+            await results.aclose()
+            # Give the server a moment to notice disconnected clients
+            await asyncio.sleep(0.2)
+            return city_id, dict(server_stats)
+
+    start = time.perf_counter()
+    city_id, stats = asyncio.run(run_with_server(scenario))
+
+    assert city_id == 2643743
+    assert stats['cancelled'] == len(slow_city_ids), f"Expected cancelled slow requests, got {stats}"
+    assert stats['in_flight'] == 0
+    assert time.perf_counter() - start < 1, "Closing the iterator should not wait for slow requests"
+
+def test_async_helper_archives_in_worker_thread(tmp_path):
+    """
+    Test checks:
+    1. Responses are archived and full segments are written
+    2. AsyncApiHelper is not an ApiHelper, so blocking consumers reject it
+    """
+    city_ids = list(range(1000, 1010))
+    archive = ArchiveHelper(archive_dir=str(tmp_path / 'archive'), segment_size=4)
+
+    async def scenario(base_url):
+        async with AsyncApiHelper(archive=archive, base_url=base_url) as api:
+            assert not isinstance(api, ApiHelper)
+            return [city_id async for city_id, _ in api.iter_current_weather(city_ids)]
+
+    asyncio.run(run_with_server(scenario))
+
+    assert len(archive.segments()) == 2, "Full segments should be written while requests run"
+    assert sorted(archive.read_columns(['city_id'])['city_id'].tolist()) == city_ids
@@ -0,0 +1,125 @@
+import pytest
+from automation_framework.utilities.archive_helpers import ArchiveHelper
+from automation_framework.utilities.db_helpers import DBHelper
+from automation_framework.utilities.scheduler_helpers import SchedulerHelper
+
+CITY_IDS = [
+    2643743,  # London
+    1850147,  # Tokyo
+    5128581,  # New York
+]
+
+class FakeApi:
+    """Stand-in for ApiHelper that serves observations from a dict"""
+
+    def __init__(self, observations):
+        self.observations = observations
+        self.calls = []
+
+    def get_current_weather(self, city_id):
+        self.calls.append(city_id)
+        dt = self.observations[city_id]
+        if dt is None:
+            raise ValueError(f"API response doesn't contain weather data for {city_id}")
+        return {'id': city_id, 'dt': dt, 'main': {'temp': 10.0, 'feels_like': 9.0}}
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DBHelper()
+
+def test_refresh_only_stale_cities(db):
+    """
+    Test checks:
+    1. All cities are fetched on first run
+    2. Nothing is fetched before the next observation is expected
+    3. Request budget is respected and most overdue city goes first
+    4. Only fetched cities are saved
+    """
+    api = FakeApi({city_id: 1000 for city_id in CITY_IDS})
+    scheduler = SchedulerHelper(api, db, CITY_IDS, default_cadence=600)
+
+    assert list(scheduler.refresh(budget=10, now=1100)) == CITY_IDS
+    assert db.get_weather_data(CITY_IDS[0]) is not None
+
+    api.calls.clear()
+    assert scheduler.refresh(budget=10, now=1300) == {}
+    assert api.calls == []
+
+    scheduler.state[CITY_IDS[1]]['last_dt'] = 500
+    assert scheduler.select(budget=1, now=1700) == [CITY_IDS[1]]
+    assert len(scheduler.select(budget=2, now=1700)) == 2
+
+    scheduler.state[CITY_IDS[2]]['cadence'] = 5000
+    assert list(scheduler.refresh(budget=1, now=1700)) == [CITY_IDS[1]]
+    saved = db.get_refresh_state()
+    assert saved[CITY_IDS[1]]['last_fetch'] == 1700
+    assert saved[CITY_IDS[2]]['cadence'] == 600, "Only fetched cities should be saved"
+
+def test_refresh_after_restart(db):
+    """
+    Test checks:
+    1. Cities whose weather was dropped by a new DBHelper are fetched again
+    2. Fresh cities with stored weather are still skipped
+    """
+    api = FakeApi({city_id: 1000 for city_id in CITY_IDS})
+    SchedulerHelper(api, db, CITY_IDS[:2]).refresh(budget=10, now=1100)
+
+    # New process: DBHelper recreates weather table, refresh state is kept
+    restarted_db = DBHelper()
+    scheduler = SchedulerHelper(api, restarted_db, CITY_IDS[:2])
+    assert set(scheduler.refresh(budget=10, now=1200)) == set(CITY_IDS[:2])
+    for city_id in CITY_IDS[:2]:
+        assert restarted_db.get_weather_data(city_id) is not None, f"Data for city {city_id} not found in DB"
+
+    api.calls.clear()
+    assert scheduler.refresh(budget=10, now=1300) == {}
+    assert api.calls == []
+
+def test_cadence_learning_and_backoff(db):
+    """
+    Test checks:
+    1. Cadence follows observed update intervals
+    2. Unchanged observations and failures back off re-checks
+    3. State survives between scheduler instances
+    """
+    city_id = CITY_IDS[0]
+    scheduler = SchedulerHelper(FakeApi({}), db, [city_id], default_cadence=600, smoothing=1.0)
+
+    scheduler.observe(city_id, 1000, fetched_at=1010)
+    scheduler.observe(city_id, 1300, fetched_at=1310)
+    assert scheduler.state[city_id]['cadence'] == 300
+
+    scheduler.observe(city_id, 1300, fetched_at=1610)
+    scheduler.observe(city_id, 1300, fetched_at=1730)
+    assert scheduler.state[city_id]['misses'] == 2
+    assert scheduler.due_at(city_id) == 1730 + 240
+
+    scheduler.api = FakeApi({city_id: None})
+    assert scheduler.refresh(budget=1, now=2000) == {}
+    assert scheduler.state[city_id]['misses'] == 3
+    assert scheduler.select(budget=1, now=2001) == [], "Failed city without stored weather should back off"
+
+    restored = SchedulerHelper(FakeApi({}), db, [city_id])
+    assert restored.state[city_id] == scheduler.state[city_id]
+
+def test_learn_cadence_from_archive(db, tmp_path):
+    """
+    Test checks:
+    1. Cadence and last observation are initialized from archived responses
+    """
+    archive = ArchiveHelper(archive_dir=str(tmp_path / 'archive'))
+    for i, dt in enumerate([1000, 1000, 1900, 2800, 3700]):
+        archive.append({'id': CITY_IDS[0], 'dt': dt, 'main': {'temp': 1.0, 'feels_like': 0.5}}, fetched_at=dt + 30 + i)
+
+    archive.replay(db)
+    scheduler = SchedulerHelper(FakeApi({}), db, CITY_IDS)
+    scheduler.learn_from_archive(archive)
+
+    state = scheduler.state[CITY_IDS[0]]
+    assert state['cadence'] == 900
+    assert state['last_dt'] == 3700
+    assert scheduler.select(budget=10, now=4000) == CITY_IDS[1:]
+
+    restored = SchedulerHelper(FakeApi({}), db, CITY_IDS)
+    assert restored.state[CITY_IDS[0]]['cadence'] == 900
@@ -0,0 +1,206 @@
+import os
+import shutil
+import pytest
+import numpy as np
+import requests
+from automation_framework.utilities.api_helpers import ApiHelper
+from automation_framework.utilities import archive_helpers
+from automation_framework.utilities.archive_helpers import ArchiveHelper
+from automation_framework.utilities.db_helpers import DBHelper
+
+# Sample API responses (city ID: temperature, feels_like)
+READINGS = {
+    2643743: (11.5, 10.2),  # London
+    1850147: (18.3, 17.9),  # Tokyo
+    5128581: (7.1, 4.8),    # New York
+}
+
+def make_response(city_id, temperature, feels_like, dt):
+    return {
+        'id': city_id,
+        'dt': dt,
+        'main': {'temp': temperature, 'feels_like': feels_like, 'humidity': 80, 'pressure': 1012},
+        'wind': {'speed': 3.6, 'deg': 250},
+        'clouds': {'all': 40},
+        'weather': [{'id': 803, 'main': 'Clouds'}],
+    }
+
+@pytest.fixture
+def archive(tmp_path):
+    return ArchiveHelper(archive_dir=str(tmp_path / 'archive'), segment_size=2)
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DBHelper()
+
+def test_archive_append_and_scan(archive):
+    """
+    Test checks:
+    1. Responses are sealed into segments of segment_size readings
+    2. Columns match the API responses
+    3. Raw responses are kept unchanged
+    """
+    responses = [
+        make_response(city_id, temperature, feels_like, 1700000000 + i)
+        for i, (city_id, (temperature, feels_like)) in enumerate(READINGS.items())
+    ]
+    for i, response in enumerate(responses):
+        archive.append(response, fetched_at=1700000100 + i)
+    archive.flush()
+
+    assert len(archive.segments()) == 2, "Expected one full and one partial segment"
+    assert len(archive) == len(responses)
+
+    columns = archive.read_columns(['city_id', 'temp', 'humidity', 'wind_gust'])
+    assert columns['city_id'].tolist() == list(READINGS)
+    assert columns['temp'].tolist() == [temperature for temperature, _ in READINGS.values()]
+    assert np.all(columns['humidity'] == 80)
+    assert np.all(np.isnan(columns['wind_gust'])), "Missing fields should be stored as NaN"
+
+    assert list(archive.iter_raw()) == responses
+
+def test_archive_compaction(archive):
+    """
+    Test checks:
+    1. Small segments are merged up to max_rows
+    2. Data and order are preserved after compaction
+    """
+    for i in range(5):
+        archive.append(make_response(2643743, float(i), float(i), 1700000000 + i))
+        archive.flush()
+    before = archive.read_columns()
+
+    removed = archive.compact(max_rows=4)
+
+    assert removed == 3
+    assert [len(segment) for segment in archive.segments()] == [4, 1]
+    after = archive.read_columns()
+    for name in before:
+        np.testing.assert_array_equal(before[name], after[name])
+
+def test_archive_replay_into_db(archive, db):
+    """
+    Test checks:
+    1. Replay inserts readings into DB in fetch order
+    2. Time window filters readings
+    """
+    for i, (city_id, (temperature, feels_like)) in enumerate(READINGS.items()):
+        archive.append(make_response(city_id, temperature, feels_like, 1700000000), fetched_at=1000 + i)
+    archive.append(make_response(2643743, 25.0, 24.0, 1700000600), fetched_at=2000)
+
+    assert archive.replay(db, until=2000) == len(READINGS)
+    for city_id, (temperature, feels_like) in READINGS.items():
+        db_data = db.get_weather_data(city_id)
+        assert db_data is not None, f"Data for city {city_id} not found in DB"
+        assert abs(db_data['api_temperature'] - temperature) < 0.01
+        assert abs(db_data['api_feels_like'] - feels_like) < 0.01
+
+    assert archive.replay(db) == len(READINGS) + 1
+    assert db.get_weather_data(2643743)['api_temperature'] == 25.0
+
+def test_archive_compaction_failure_keeps_segments(archive, monkeypatch):
+    """
+    Test checks:
+    1. Failed write of merged segment leaves source segments untouched
+    2. Interrupted swap is finished when the archive is opened again
+    """
+    for i in range(3):
+        archive.append(make_response(2643743, float(i), float(i), 1700000000 + i))
+        archive.flush()
+    before = archive.read_columns()
+
+    original_save = np.save
+    def failing_save(path, values):
+        if path.endswith('wind_gust.npy'):
+            raise OSError("No space left on device")
+        original_save(path, values)
+    monkeypatch.setattr(archive_helpers.np, 'save', failing_save)
+    with pytest.raises(OSError):
+        archive.compact(max_rows=4)
+    monkeypatch.undo()
+    np.testing.assert_array_equal(archive.read_columns()['temp'], before['temp'])
+    assert not [name for name in os.listdir(archive.archive_dir) if name.startswith('.')]
+
+    # Crash after the first source segment was retired
+    monkeypatch.setattr(archive, '_swap_segments', lambda tmp_path, sources: None)
+    archive.compact(max_rows=4)
+    monkeypatch.undo()
+    first = archive._segment_names()[0]
+    trash = os.path.join(archive.archive_dir, f'.trash-{os.getpid()}-{first}')
+    os.makedirs(trash)
+    os.replace(os.path.join(archive.archive_dir, first), os.path.join(trash, first))
+
+    # Leftovers of this process belong to a running writer, so pretend it crashed
+    monkeypatch.setattr(archive_helpers, '_owner_alive', lambda name, prefix: False)
+    reopened = ArchiveHelper(archive_dir=archive.archive_dir)
+    assert len(reopened.segments()) == 1
+    after = reopened.read_columns()
+    for name in before:
+        np.testing.assert_array_equal(before[name], after[name])
+    assert not [name for name in os.listdir(archive.archive_dir) if name.startswith('.')]
+
+def test_archive_shared_directory(tmp_path, monkeypatch):
+    """
+    Test checks:
+    1. Two helpers on one directory write segments under different names
+    2. Complete leftover segment is recovered, incomplete one is removed
+    """
+    archive_dir = str(tmp_path / 'archive')
+    first = ArchiveHelper(archive_dir=archive_dir)
+    second = ArchiveHelper(archive_dir=archive_dir)
+    first.append(make_response(2643743, 1.0, 1.0, 1700000000))
+    second.append(make_response(1850147, 2.0, 2.0, 1700000000))
+    first.flush()
+    second.flush()
+    assert sorted(ArchiveHelper(archive_dir=archive_dir).read_columns(['city_id'])['city_id'].tolist()) == \
+        sorted([2643743, 1850147])
+
+    first.append(make_response(5128581, 3.0, 3.0, 1700000000))
+    batch = first.take_batch()
+    complete = first._write_tmp_segment(*batch)
+    incomplete = first._write_tmp_segment(*batch)
+    os.remove(os.path.join(incomplete, 'raw.bin'))
+
+    monkeypatch.setattr(archive_helpers, '_owner_alive', lambda name, prefix: False)
+    reopened = ArchiveHelper(archive_dir=archive_dir)
+    assert len(reopened.segments()) == 3
+    assert not os.path.exists(complete) and not os.path.exists(incomplete)
+
+def test_api_responses_are_archived(tmp_path, monkeypatch):
+    """
+    Test checks:
+    1. Responses returned by get_current_weather are written to the archive
+    """
+    response = make_response(2643743, 11.5, 10.2, 1700000000)
+
+    class FakeResponse:
+        status_code = 200
+        text = ''
+
+        def json(self):
+            return response
+
+    monkeypatch.setattr(requests, 'get', lambda url, params: FakeResponse())
+    archive_dir = str(tmp_path / 'archive')
+    with ArchiveHelper(archive_dir=archive_dir) as archive:
+        api = ApiHelper(archive=archive)
+        assert api.get_current_weather(2643743) == response
+
+    assert list(ArchiveHelper(archive_dir=archive_dir).iter_raw()) == [response]
+
+def test_archive_exit_flush(tmp_path):
+    """
+    Test checks:
+    1. Live archives are flushed by the single exit hook
+    2. Flush errors at exit are reported instead of raised
+    """
+    archive_dir = tmp_path / 'archive'
+    archive = ArchiveHelper(archive_dir=str(archive_dir))
+    archive.append(make_response(2643743, 11.5, 10.2, 1700000000))
+    archive_helpers._flush_open_archives()
+    assert len(ArchiveHelper(archive_dir=str(archive_dir)).segments()) == 1
+
+    archive.append(make_response(2643743, 11.5, 10.2, 1700000600))
+    shutil.rmtree(archive_dir)
+    archive_helpers._flush_open_archives()
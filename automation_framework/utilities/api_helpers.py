@@ -3,11 +3,15 @@ import configparser
 import os
 from typing import Dict, Any
 
-class ApiHelper:
-    def __init__(self):
+class BaseApiHelper:
+    """Config loading and response validation shared by blocking and async API helpers"""
+    
+    def __init__(self, archive=None):
         self.config = self._load_config()
         self.api_key = self.config['API']['API_KEY']
         self.base_url = self.config['API']['BASE_URL']
+        # Optional ArchiveHelper that keeps every raw response
+        self.archive = archive
         
     def _load_config(self) -> configparser.ConfigParser:
         """
@@ -45,6 +49,60 @@ class ApiHelper:
                     
         return config
         
+    def _build_params(self, city_id: int) -> Dict[str, Any]:
+        """Builds query parameters for current weather request"""
+        return {
+            'id': city_id,
+            'appid': self.api_key,
+            'units': 'metric',
+            'lang': 'en'
+        }
+        
+    def _validate_weather_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validates API response
+        
+        Args:
+            data: Decoded API response
+            
+        Returns:
+            Dict with weather data
+            
+        Raises:
+            ValueError: if API response doesn't contain expected data
+        """
+        # Check for required data
+        if 'main' not in data:
+            raise ValueError(f"API response doesn't contain weather data: {data}")
+            
+        if 'temp' not in data['main'] or 'feels_like' not in data['main']:
+            raise ValueError(f"API response doesn't contain temperature: {data['main']}")
+            
+        return data
+        
+    def _process_weather_data(self, data: Dict[str, Any], flush: bool = True) -> Dict[str, Any]:
+        """
+        Validates API response and archives it
+        
+        Args:
+            data: Decoded API response
+            flush: Write a full archive segment right away, async callers write it themselves
+            
+        Returns:
+            Dict with weather data
+            
+        Raises:
+            ValueError: if API response doesn't contain expected data
+        """
+        self._validate_weather_data(data)
+        
+        if self.archive is not None:
+            self.archive.append(data, flush=flush)
+            
+        return data
+
+
+class ApiHelper(BaseApiHelper):
     def get_current_weather(self, city_id: int) -> Dict[str, Any]:
         """
         Get current weather for city by its ID
@@ -59,12 +117,7 @@ class ApiHelper:
             requests.exceptions.RequestException: if API request fails
             ValueError: if API response doesn't contain expected data
         """
-        params = {
-            'id': city_id,
-            'appid': self.api_key,
-            'units': 'metric',
-            'lang': 'en'
-        }
+        params = self._build_params(city_id)
         
         print(f"Calling API for city {city_id} with parameters: {params}")
         response = requests.get(self.base_url, params=params)
@@ -73,13 +126,4 @@ class ApiHelper:
             print(f"API error: {response.status_code} - {response.text}")
             response.raise_for_status()
             
-        data = response.json()
-        
-        # Check for required data
-        if 'main' not in data:
-            raise ValueError(f"API response doesn't contain weather data: {data}")
-            
-        if 'temp' not in data['main'] or 'feels_like' not in data['main']:
-            raise ValueError(f"API response doesn't contain temperature: {data['main']}")
-            
-        return data
+        return self._process_weather_data(response.json())
@@ -0,0 +1,490 @@
+import numpy as np
+import atexit
+import configparser
+import json
+import os
+import shutil
+import time
+import uuid
+import weakref
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+# Column layout of every segment: name -> dtype.
+# Missing values are stored as NaN (float columns) or 0 (integer columns).
+COLUMNS = {
+    'timestamp': np.float64,   # Fetch time (unix seconds)
+    'dt': np.int64,            # Observation time reported by OpenWeather
+    'city_id': np.int64,
+    'temp': np.float64,
+    'feels_like': np.float64,
+    'temp_min': np.float32,
+    'temp_max': np.float32,
+    'humidity': np.float32,
+    'pressure': np.float32,
+    'visibility': np.float32,
+    'wind_speed': np.float32,
+    'wind_deg': np.float32,
+    'wind_gust': np.float32,
+    'clouds': np.float32,
+    'weather_id': np.int32,
+}
+
+# Where each column lives in the API response: (section, key)
+_SOURCE_FIELDS = {
+    'dt': (None, 'dt'),
+    'city_id': (None, 'id'),
+    'temp': ('main', 'temp'),
+    'feels_like': ('main', 'feels_like'),
+    'temp_min': ('main', 'temp_min'),
+    'temp_max': ('main', 'temp_max'),
+    'humidity': ('main', 'humidity'),
+    'pressure': ('main', 'pressure'),
+    'visibility': (None, 'visibility'),
+    'wind_speed': ('wind', 'speed'),
+    'wind_deg': ('wind', 'deg'),
+    'wind_gust': ('wind', 'gust'),
+    'clouds': ('clouds', 'all'),
+}
+
+SEGMENT_PREFIX = 'seg-'
+# Temporary and retired directories are named <prefix><pid>-<...> so that
+# recovery leaves alone the ones of processes still running
+TMP_PREFIX = '.tmp-'
+TRASH_PREFIX = '.trash-'
+# Written into a merged segment once it is complete, lists the segments it replaces
+SOURCES_FILE = 'sources.json'
+
+
+class ArchiveSegment:
+    """
+    Read-only view of one archive segment
+
+    Columns are memory-mapped NumPy arrays, so slicing and reductions
+    read straight from the page cache without copying.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in COLUMNS
+        }
+        self._raw_offsets = np.load(os.path.join(path, 'raw_offsets.npy'), mmap_mode='r')
+        raw_path = os.path.join(path, 'raw.bin')
+        if os.path.getsize(raw_path) > 0:
+            self._raw = np.memmap(raw_path, dtype=np.uint8, mode='r')
+        else:
+            self._raw = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def raw(self, index: int) -> Dict[str, Any]:
+        """
+        Get the original API response of a reading
+
+        Args:
+            index: Reading position within the segment
+
+        Returns:
+            Dict with weather data as returned by the API
+        """
+        return json.loads(self.raw_bytes(index))
+
+    def raw_bytes(self, index: int) -> bytes:
+        """
+        Get the encoded API response of a reading
+
+        Args:
+            index: Reading position within the segment
+
+        Returns:
+            JSON payload bytes
+        """
+        start, end = int(self._raw_offsets[index]), int(self._raw_offsets[index + 1])
+        return self._raw[start:end].tobytes()
+
+
+# Archives still alive, flushed once at interpreter exit
+_open_archives = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_archives():
+    for archive in list(_open_archives):
+        try:
+            archive.flush()
+        except OSError as e:
+            print(f"Archive: failed to flush {archive.archive_dir} at exit: {e}")
+
+
+class ArchiveHelper:
+    """
+    Append-only columnar archive of raw weather API responses
+
+    Readings are buffered in memory and sealed into immutable segments of
+    typed .npy columns plus the raw JSON payloads. Sealed segments are
+    memory-mapped on read.
+
+    Buffered readings reach disk only when a segment fills up, on flush(),
+    when leaving a `with` block or at interpreter exit. Flush or use the
+    archive as a context manager if it may be dropped before exit.
+    """
+
+    def __init__(self, archive_dir: Optional[str] = None, segment_size: Optional[int] = None):
+        self.config = configparser.ConfigParser()
+        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.ini')
+        self.config.read(config_path)
+        self.archive_dir = archive_dir or self.config.get('ARCHIVE', 'ARCHIVE_DIR', fallback='archive')
+        self.segment_size = segment_size or self.config.getint('ARCHIVE', 'SEGMENT_SIZE', fallback=65536)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self._recover()
+        self._buffer = {name: [] for name in COLUMNS}
+        self._raw_buffer = []
+        _open_archives.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments()) + len(self._raw_buffer)
+
+    def append(self, data: Dict[str, Any], fetched_at: Optional[float] = None, flush: bool = True):
+        """
+        Append raw API response to archive
+
+        Args:
+            data: Dict with weather data as returned by get_current_weather
+            fetched_at: Fetch time in unix seconds, defaults to now
+            flush: Seal the buffer into a segment once it is full
+        """
+        self._buffer['timestamp'].append(time.time() if fetched_at is None else fetched_at)
+        for name, (section, key) in _SOURCE_FIELDS.items():
+            source = data.get(section, {}) if section else data
+            value = source.get(key)
+            if value is None:
+                value = 0 if np.issubdtype(COLUMNS[name], np.integer) else np.nan
+            self._buffer[name].append(value)
+        weather = data.get('weather') or [{}]
+        self._buffer['weather_id'].append(weather[0].get('id', 0))
+        self._raw_buffer.append(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+        if flush and self.full:
+            self.flush()
+
+    @property
+    def full(self) -> bool:
+        """Whether buffered readings fill a whole segment"""
+        return len(self._raw_buffer) >= self.segment_size
+
+    def flush(self):
+        """Seal buffered readings into a new segment"""
+        batch = self.take_batch()
+        if batch is not None:
+            self.write_batch(batch)
+
+    def take_batch(self) -> Optional[Tuple[Dict[str, np.ndarray], List[bytes]]]:
+        """
+        Detach buffered readings as a batch for write_batch()
+
+        Taking a batch is cheap, so callers on an event loop can take it
+        there and run the blocking write_batch() in a worker thread.
+
+        Returns:
+            Batch with columns and payloads, None if buffer is empty
+        """
+        if not self._raw_buffer:
+            return None
+        columns = {column: np.asarray(values, dtype=COLUMNS[column]) for column, values in self._buffer.items()}
+        payloads = self._raw_buffer
+        self._buffer = {column: [] for column in COLUMNS}
+        self._raw_buffer = []
+        return columns, payloads
+
+    def write_batch(self, batch: Tuple[Dict[str, np.ndarray], List[bytes]]):
+        """
+        Seal batch from take_batch() into a segment
+
+        Args:
+            batch: Batch returned by take_batch()
+        """
+        self._write_segment(*batch)
+
+    def segments(self) -> List[ArchiveSegment]:
+        """
+        Get sealed segments in append order
+
+        Returns:
+            List of memory-mapped segments
+        """
+        return [ArchiveSegment(os.path.join(self.archive_dir, name)) for name in self._segment_names()]
+
+    def scan(self, columns: Optional[List[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over segments as zero-copy column arrays
+
+        Args:
+            columns: Column names to return, defaults to all columns
+
+        Returns:
+            Iterator of dicts with column name -> memory-mapped array
+        """
+        self.flush()
+        names = columns or list(COLUMNS)
+        for segment in self.segments():
+            yield {name: segment[name] for name in names}
+
+    def read_columns(self, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Read columns of the whole archive into contiguous arrays
+
+        Args:
+            columns: Column names to return, defaults to all columns
+
+        Returns:
+            Dict with column name -> array
+        """
+        names = columns or list(COLUMNS)
+        chunks = {name: [] for name in names}
+        for segment in self.scan(names):
+            for name in names:
+                chunks[name].append(segment[name])
+        return {
+            name: np.concatenate(chunks[name]) if chunks[name] else np.zeros(0, dtype=COLUMNS[name])
+            for name in names
+        }
+
+    def iter_raw(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over original API responses in append order
+
+        Returns:
+            Iterator of dicts with weather data
+        """
+        self.flush()
+        for segment in self.segments():
+            for index in range(len(segment)):
+                yield segment.raw(index)
+
+    def replay(self, db, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """
+        Replay archived readings into database in fetch order
+
+        Args:
+            db: DBHelper to insert readings into
+            since: Only replay readings fetched at or after this unix time
+            until: Only replay readings fetched before this unix time
+
+        Returns:
+            Number of replayed readings
+        """
+        replayed = 0
+        for segment in self.scan(['timestamp', 'city_id', 'temp', 'feels_like']):
+            mask = np.ones(len(segment['timestamp']), dtype=bool)
+            if since is not None:
+                mask &= segment['timestamp'] >= since
+            if until is not None:
+                mask &= segment['timestamp'] < until
+            # One transaction per segment keeps memory bounded by segment size
+            rows = list(zip(
+                segment['city_id'][mask].tolist(),
+                segment['temp'][mask].tolist(),
+                segment['feels_like'][mask].tolist(),
+            ))
+            db.insert_api_weather_data_many(rows)
+            replayed += len(rows)
+        return replayed
+
+    def compact(self, max_rows: Optional[int] = None) -> int:
+        """
+        Merge runs of adjacent small segments into larger ones
+
+        Segments being merged are removed from disk, so views returned by
+        segments() or scan() must not be used after compaction.
+
+        Args:
+            max_rows: Upper bound of readings per merged segment, defaults to segment_size
+
+        Returns:
+            Number of segments removed
+        """
+        self.flush()
+        max_rows = max_rows or self.segment_size
+        runs, run, run_rows = [], [], 0
+        for name in self._segment_names():
+            rows = len(np.load(os.path.join(self.archive_dir, name, 'timestamp.npy'), mmap_mode='r'))
+            if run and run_rows + rows > max_rows:
+                runs.append(run)
+                run, run_rows = [], 0
+            run.append(os.path.join(self.archive_dir, name))
+            run_rows += rows
+        if run:
+            runs.append(run)
+
+        removed = 0
+        for paths in runs:
+            if len(paths) < 2:
+                continue
+            columns, payloads = self._read_segments(paths)
+            self._replace_segments(paths, columns, payloads)
+            removed += len(paths) - 1
+        return removed
+
+    def _segment_names(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.archive_dir)
+            if name.startswith(SEGMENT_PREFIX) and os.path.isdir(os.path.join(self.archive_dir, name))
+        )
+
+    def _write_segment(self, columns: Dict[str, np.ndarray], payloads: List[bytes]):
+        """Write segment into temporary directory and move it into place"""
+        self._publish_segment(self._write_tmp_segment(columns, payloads))
+
+    def _publish_segment(self, tmp_path: str) -> str:
+        """
+        Move complete segment into place under the next free name
+
+        The name is picked at rename time and the rename fails if another
+        writer took it first, so writers sharing a directory never collide.
+        """
+        for _ in range(100):
+            names = self._segment_names()
+            last = int(names[-1][len(SEGMENT_PREFIX):]) if names else 0
+            path = os.path.join(self.archive_dir, f'{SEGMENT_PREFIX}{last + 1:08d}')
+            try:
+                os.rename(tmp_path, path)
+                return path
+            except OSError:
+                if not os.path.exists(path):
+                    raise
+        raise OSError(f"No free segment name for {tmp_path}")
+
+    def _write_tmp_segment(self, columns: Dict[str, np.ndarray], payloads: List[bytes],
+                           sources: Optional[List[str]] = None) -> str:
+        """
+        Write segment files into new temporary directory and return its path
+
+        A merged segment records its sources before any data, so recovery
+        never mistakes it for a new segment. The directory is removed if
+        writing fails.
+        """
+        tmp_path = os.path.join(self.archive_dir, f'{TMP_PREFIX}{os.getpid()}-{uuid.uuid4().hex}')
+        os.makedirs(tmp_path)
+        try:
+            if sources is not None:
+                with open(os.path.join(tmp_path, SOURCES_FILE), 'w') as f:
+                    json.dump(sources, f)
+            for column, values in columns.items():
+                np.save(os.path.join(tmp_path, f'{column}.npy'), values)
+            offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+            np.cumsum([len(payload) for payload in payloads], out=offsets[1:])
+            np.save(os.path.join(tmp_path, 'raw_offsets.npy'), offsets)
+            with open(os.path.join(tmp_path, 'raw.bin'), 'wb') as f:
+                f.writelines(payloads)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return tmp_path
+
+    @staticmethod
+    def _is_complete_segment(path: str) -> bool:
+        """Check that all segment files exist and agree on the number of readings"""
+        try:
+            segment = ArchiveSegment(path)
+            rows = len(segment)
+            return (
+                all(len(values) == rows for values in segment.columns.values())
+                and len(segment._raw_offsets) == rows + 1
+                and int(segment._raw_offsets[-1]) == len(segment._raw)
+            )
+        except (OSError, ValueError):
+            return False
+
+    def _read_segments(self, paths: List[str]):
+        """Copy columns and payloads of segments into memory so the files can be released"""
+        segments = [ArchiveSegment(path) for path in paths]
+        columns = {name: np.concatenate([segment[name] for segment in segments]) for name in COLUMNS}
+        payloads = [segment.raw_bytes(index) for segment in segments for index in range(len(segment))]
+        return columns, payloads
+
+    def _replace_segments(self, paths: List[str], columns: Dict[str, np.ndarray], payloads: List[bytes]):
+        """
+        Replace segments with one merged segment keeping the first name
+
+        The merged segment is fully written before any source segment is
+        touched, so an interrupted swap can be finished by _recover().
+        """
+        sources = [os.path.basename(path) for path in paths]
+        tmp_path = self._write_tmp_segment(columns, payloads, sources)
+        self._swap_segments(tmp_path, sources)
+
+    def _swap_segments(self, tmp_path: str, sources: List[str]):
+        """Retire source segments and move merged segment into place"""
+        name = sources[0]
+        trash = os.path.join(self.archive_dir, f'{TRASH_PREFIX}{os.getpid()}-{name}')
+        os.makedirs(trash, exist_ok=True)
+        for source in sources:
+            path = os.path.join(self.archive_dir, source)
+            if os.path.isdir(path):
+                os.replace(path, os.path.join(trash, source))
+        os.replace(tmp_path, os.path.join(self.archive_dir, name))
+        os.remove(os.path.join(self.archive_dir, name, SOURCES_FILE))
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def _recover(self):
+        """Finish or roll back segment writes interrupted by a crash"""
+        for name in sorted(os.listdir(self.archive_dir)):
+            if not name.startswith(TMP_PREFIX) or _owner_alive(name, TMP_PREFIX):
+                continue
+            tmp_path = os.path.join(self.archive_dir, name)
+            sources_path = os.path.join(tmp_path, SOURCES_FILE)
+            if not self._is_complete_segment(tmp_path):
+                print(f"Archive: removing incomplete segment {tmp_path}")
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            elif os.path.exists(sources_path):
+                with open(sources_path) as f:
+                    sources = json.load(f)
+                print(f"Archive: finishing interrupted compaction of {', '.join(sources)}")
+                self._swap_segments(tmp_path, sources)
+            else:
+                path = self._publish_segment(tmp_path)
+                print(f"Archive: recovered segment {tmp_path} as {path}")
+
+        # Merged segment is already in place once its temporary directory is gone
+        for name in sorted(os.listdir(self.archive_dir)):
+            if name.startswith(TRASH_PREFIX) and not _owner_alive(name, TRASH_PREFIX):
+                trash = os.path.join(self.archive_dir, name)
+                print(f"Archive: removing segments retired by compaction {trash}")
+                shutil.rmtree(trash, ignore_errors=True)
+
+
+def _owner_alive(name: str, prefix: str) -> bool:
+    """Check whether process that created temporary or retired directory is still running"""
+    try:
+        pid = int(name[len(prefix):].split('-', 1)[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        import ctypes
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,143 @@
+import asyncio
+import aiohttp
+from typing import Dict, Any, Iterable, AsyncIterator, Tuple, Optional, Union
+from automation_framework.utilities.api_helpers import BaseApiHelper
+
+
+class AsyncApiHelper(BaseApiHelper):
+    """
+    Asyncio variant of ApiHelper for high fan-out monitoring
+
+    Requests share one pooled aiohttp session and are bounded by a
+    semaphore, so tens of thousands of cities can be queried from a single
+    event loop. Responses are validated exactly like ApiHelper does.
+
+    Coroutine API: not a drop-in replacement for ApiHelper consumers such
+    as SchedulerHelper. Full archive segments are written in a worker
+    thread so the event loop is not blocked.
+    """
+
+    def __init__(self, archive=None, max_concurrency: int = 1000, timeout: float = 10.0,
+                 base_url: Optional[str] = None):
+        """
+        Args:
+            archive: Optional ArchiveHelper that keeps every raw response
+            max_concurrency: Maximum number of requests in flight
+            timeout: Default total timeout of one request in seconds
+            base_url: Overrides BASE_URL from config, e.g. for a local stand-in server
+        """
+        super().__init__(archive)
+        if base_url:
+            self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def open(self):
+        """Open pooled HTTP session"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Close pooled HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_current_weather(self, city_id: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get current weather for city by its ID
+
+        Args:
+            city_id: City ID
+            timeout: Total timeout of this request in seconds, defaults to helper timeout
+
+        Returns:
+            Dict with weather data
+
+        Raises:
+            aiohttp.ClientError: if API request fails
+            asyncio.TimeoutError: if API request times out
+            ValueError: if API response doesn't contain expected data
+        """
+        await self.open()
+        request_timeout = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+        async with self._semaphore:
+            async with self._session.get(self.base_url, params=self._build_params(city_id),
+                                         timeout=request_timeout) as response:
+                if response.status != 200:
+                    print(f"API error: {response.status} - {await response.text()}")
+                    response.raise_for_status()
+                data = await response.json(content_type=None)
+
+        self._process_weather_data(data, flush=False)
+        if self.archive is not None and self.archive.full:
+            batch = self.archive.take_batch()
+            await asyncio.get_running_loop().run_in_executor(None, self.archive.write_batch, batch)
+        return data
+
+    async def iter_current_weather(
+        self,
+        city_ids: Iterable[int],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], BaseException]]]:
+        """
+        Get current weather for many cities, yielding results as they complete
+
+        At most max_concurrency requests are scheduled at a time, so city_ids
+        may be a large or lazy iterable. Requests still in flight are
+        cancelled when the iterator is closed or cancelled.
+
+        Args:
+            city_ids: City IDs
+            timeout: Total timeout of each request in seconds, defaults to helper timeout
+            return_exceptions: Yield request errors instead of raising them
+
+        Returns:
+            Async iterator of (city_id, weather data or exception)
+        """
+        city_ids = iter(city_ids)
+        pending = {}
+
+        def schedule():
+            while len(pending) < self.max_concurrency:
+                city_id = next(city_ids, None)
+                if city_id is None:
+                    return
+                task = asyncio.ensure_future(self.get_current_weather(city_id, timeout))
+                pending[task] = city_id
+
+        try:
+            schedule()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Retrieve every error first so none is left unobserved if one is raised
+                errors = {task: task.exception() for task in done}
+                for task in done:
+                    city_id = pending.pop(task)
+                    error = errors[task]
+                    if error is None:
+                        yield city_id, task.result()
+                    elif return_exceptions and isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ValueError)):
+                        yield city_id, error
+                    else:
+                        raise error
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
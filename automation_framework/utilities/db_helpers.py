@@ -1,7 +1,7 @@
 import sqlite3
 import configparser
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Set, Tuple
 from datetime import datetime
 
 class DBHelper:
@@ -11,6 +11,7 @@ class DBHelper:
         self.config.read(config_path)
         self.db_name = self.config['DB']['DB_NAME']
         self._create_table()
+        self._create_refresh_state_table()
     
     def _create_table(self):
         """Creates table for storing weather data"""
@@ -34,6 +35,21 @@ class DBHelper:
             ''')
             conn.commit()
     
+    def _create_refresh_state_table(self):
+        """Creates table for storing refresh scheduler state, kept between runs"""
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS refresh_state (
+                    city_id INTEGER PRIMARY KEY,
+                    last_dt INTEGER,
+                    last_fetch REAL,
+                    cadence REAL,
+                    misses INTEGER DEFAULT 0
+                )
+            ''')
+            conn.commit()
+    
     def insert_api_weather_data(self, city_id: int, temperature: float, feels_like: float):
         """
         Insert weather data from API into database
@@ -52,6 +68,22 @@ class DBHelper:
             ''', (city_id, temperature, feels_like, temperature))
             conn.commit()
     
+    def insert_api_weather_data_many(self, rows: List[Tuple[int, float, float]]):
+        """
+        Insert multiple weather readings from API into database in one transaction
+        
+        Args:
+            rows: List of (city_id, temperature, feels_like) in insertion order
+        """
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO weather_data 
+                (city_id, api_temperature, api_feels_like, average_temperature)
+                VALUES (?, ?, ?, ?)
+            ''', ((city_id, temperature, feels_like, temperature) for city_id, temperature, feels_like in rows))
+            conn.commit()
+    
     def insert_mobile_weather_data(self, city_id: int, temperature: float, feels_like: float):
         """
         Insert weather data from mobile app into database
@@ -168,3 +200,60 @@ class DBHelper:
                 }
             return None
 
+    def get_api_weather_city_ids(self) -> Set[int]:
+        """
+        Get IDs of cities with weather data from API
+        
+        Returns:
+            Set of city IDs
+        """
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT city_id
+                FROM weather_data
+                WHERE api_temperature IS NOT NULL
+            ''')
+            return {row[0] for row in cursor.fetchall()}
+
+    def get_refresh_state(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Get refresh scheduler state for all cities
+        
+        Returns:
+            Dict with city ID -> state
+        """
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT city_id, last_dt, last_fetch, cadence, misses
+                FROM refresh_state
+            ''')
+            return {
+                row[0]: {
+                    'last_dt': row[1],
+                    'last_fetch': row[2],
+                    'cadence': row[3],
+                    'misses': row[4]
+                }
+                for row in cursor.fetchall()
+            }
+
+    def save_refresh_state(self, states: Dict[int, Dict[str, Any]]):
+        """
+        Save refresh scheduler state
+        
+        Args:
+            states: Dict with city ID -> state
+        """
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO refresh_state 
+                (city_id, last_dt, last_fetch, cadence, misses)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                (city_id, state['last_dt'], state['last_fetch'], state['cadence'], state['misses'])
+                for city_id, state in states.items()
+            ))
+            conn.commit()
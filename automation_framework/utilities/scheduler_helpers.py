@@ -0,0 +1,201 @@
+import heapq
+import math
+import time
+import numpy as np
+import requests
+from typing import Dict, Any, List, Iterable, Optional
+
+
+class SchedulerHelper:
+    """
+    Refreshes only cities whose weather observation is probably stale
+
+    For every city the scheduler keeps the last observation time (`dt` of
+    the API response), the last fetch time and the learned update cadence.
+    A city is due once its next observation is expected; cities that were
+    fetched without a new observation are re-checked with exponential
+    backoff.
+
+    DBHelper recreates the weather table on every start, so a city without
+    stored API weather is due right away unless it failed in this run.
+    """
+
+    def __init__(self, api, db, city_ids: Iterable[int],
+                 default_cadence: float = 600.0,
+                 min_cadence: float = 60.0,
+                 max_cadence: float = 10800.0,
+                 retry_interval: float = 60.0,
+                 smoothing: float = 0.3):
+        """
+        Args:
+            api: ApiHelper used to fetch weather
+            db: DBHelper used to store weather and scheduler state
+            city_ids: IDs of monitored cities
+            default_cadence: Update cadence in seconds for cities without history
+            min_cadence: Lower bound of learned cadence in seconds
+            max_cadence: Upper bound of learned cadence in seconds
+            retry_interval: First re-check delay in seconds when data was not updated yet
+            smoothing: Weight of the newest interval in the cadence average
+        """
+        self.api = api
+        self.db = db
+        self.city_ids = list(city_ids)
+        self.default_cadence = default_cadence
+        self.min_cadence = min_cadence
+        self.max_cadence = max_cadence
+        self.retry_interval = retry_interval
+        self.smoothing = smoothing
+        self.state = db.get_refresh_state()
+        # Cities that failed in this run back off even without stored weather
+        self._failed = set()
+
+    def _new_state(self) -> Dict[str, Any]:
+        return {
+            'last_dt': None,
+            'last_fetch': None,
+            'cadence': self.default_cadence,
+            'misses': 0
+        }
+
+    def _clamp(self, cadence: float) -> float:
+        return min(max(cadence, self.min_cadence), self.max_cadence)
+
+    def observe(self, city_id: int, dt: int, fetched_at: float):
+        """
+        Record fetched observation and update city cadence
+
+        Args:
+            city_id: City ID
+            dt: Observation time from API response
+            fetched_at: Fetch time in unix seconds
+        """
+        state = self.state.setdefault(city_id, self._new_state())
+        if state['last_dt'] is None:
+            state['last_dt'] = dt
+            state['misses'] = 0
+        elif dt > state['last_dt']:
+            # Interval may cover several updates if we fetched late
+            interval = dt - state['last_dt']
+            updates = max(1, round(interval / state['cadence']))
+            sample = interval / updates
+            state['cadence'] = self._clamp(
+                self.smoothing * sample + (1 - self.smoothing) * state['cadence']
+            )
+            state['last_dt'] = dt
+            state['misses'] = 0
+        else:
+            state['misses'] += 1
+        state['last_fetch'] = fetched_at
+
+    def _record_failure(self, city_id: int, fetched_at: float):
+        state = self.state.setdefault(city_id, self._new_state())
+        state['last_fetch'] = fetched_at
+        state['misses'] += 1
+        self._failed.add(city_id)
+
+    def due_at(self, city_id: int) -> float:
+        """
+        Get time when city should be refreshed next
+
+        Args:
+            city_id: City ID
+
+        Returns:
+            Unix time, -inf for cities that were never fetched
+        """
+        state = self.state.get(city_id)
+        if state is None or state['last_fetch'] is None:
+            return -math.inf
+        backoff = min(self.retry_interval * 2 ** state['misses'], state['cadence'])
+        retry_at = state['last_fetch'] + backoff
+        if state['last_dt'] is None:
+            return retry_at
+        return max(state['last_dt'] + state['cadence'], retry_at)
+
+    def select(self, budget: int, now: Optional[float] = None) -> List[int]:
+        """
+        Get stale cities in refresh priority order
+
+        Args:
+            budget: Maximum number of cities to return
+            now: Current unix time, defaults to now
+
+        Returns:
+            List of city IDs, most overdue first; ties keep city_ids order
+        """
+        now = time.time() if now is None else now
+        stored = self.db.get_api_weather_city_ids()
+        overdue = []
+        for position, city_id in enumerate(self.city_ids):
+            if city_id in stored or city_id in self._failed:
+                due = self.due_at(city_id)
+            else:
+                due = -math.inf
+            if due <= now:
+                cadence = self.state[city_id]['cadence'] if city_id in self.state else self.default_cadence
+                overdue.append(((now - due) / cadence, -position, city_id))
+        return [city_id for _, _, city_id in heapq.nlargest(budget, overdue)]
+
+    def refresh(self, budget: int, now: Optional[float] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch stale cities within request budget and store results
+
+        Args:
+            budget: Maximum number of API requests
+            now: Current unix time, defaults to now
+
+        Returns:
+            Dict with city ID -> weather data for successfully fetched cities
+        """
+        results = {}
+        rows = []
+        selected = self.select(budget, now)
+        for city_id in selected:
+            fetched_at = time.time() if now is None else now
+            try:
+                data = self.api.get_current_weather(city_id)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Refresh failed for city {city_id}: {e}")
+                self._record_failure(city_id, fetched_at)
+                continue
+            self.observe(city_id, data.get('dt', 0), fetched_at)
+            self._failed.discard(city_id)
+            rows.append((city_id, data['main']['temp'], data['main']['feels_like']))
+            results[city_id] = data
+
+        self.db.insert_api_weather_data_many(rows)
+        self.db.save_refresh_state({city_id: self.state[city_id] for city_id in selected})
+        return results
+
+    def learn_from_archive(self, archive):
+        """
+        Initialize cadence and last observation of cities from archived readings
+
+        Args:
+            archive: ArchiveHelper with historical API responses
+        """
+        columns = archive.read_columns(['city_id', 'dt', 'timestamp'])
+        valid = columns['dt'] > 0
+        city_ids = columns['city_id'][valid]
+        dts = columns['dt'][valid]
+        fetched = columns['timestamp'][valid]
+        if len(city_ids) == 0:
+            return
+
+        order = np.lexsort((dts, city_ids))
+        city_ids, dts, fetched = city_ids[order], dts[order], fetched[order]
+        starts = np.flatnonzero(np.r_[True, city_ids[1:] != city_ids[:-1]])
+        learned = {}
+        for city_id, city_dts, city_fetched in zip(
+                city_ids[starts].tolist(), np.split(dts, starts[1:]), np.split(fetched, starts[1:])):
+            intervals = np.diff(np.unique(city_dts))
+            state = self.state.setdefault(city_id, self._new_state())
+            if len(intervals):
+                state['cadence'] = self._clamp(float(np.median(intervals)))
+            if state['last_dt'] is None or city_dts[-1] > state['last_dt']:
+                state['last_dt'] = int(city_dts[-1])
+                state['last_fetch'] = max(float(city_fetched.max()), state['last_fetch'] or 0.0)
+                state['misses'] = 0
+            learned[city_id] = state
+
+        self.db.save_refresh_state(learned)